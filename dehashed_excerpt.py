@@ -3,7 +3,9 @@
 dehashed_excerpt.py — robust CSV excerpt + breach count helper (enhanced)
 
 Features:
-- Streams CSV, handles quoting/newlines via csv.reader
+- Streams CSV in a single pass (sniffer sample is reused), handles quoting/newlines via csv.reader
+- Bulk-parses via pyarrow (selected columns only) when installed; falls back to csv.reader
+- Wide files without any quoting are split line-by-line from an mmap, decoding only the needed columns
 - Auto-detects delimiter with fallback heuristic; manual override supported
 - Encoding-tolerant (default utf-8 with replacement; overrideable)
 - Header aliasing for email/name/first/last/breach
@@ -21,13 +23,29 @@ Default stdout format (kept for compatibility):
 from __future__ import annotations
 
 import argparse
+import codecs
 import csv
+import io
+import itertools
 import json
+import mmap
 import os
 import re
 import sys
 from collections import OrderedDict
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:  # optional; the csv.reader path is used instead
+    pa = None
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
 ALIASES = {
     "email": {"email", "email_address", "e-mail", "mail", "addr", "address_email"},
     "name": {"name", "full_name", "fullname", "display_name"},
@@ -36,6 +54,16 @@ ALIASES = {
     "breach": {"breach", "source", "database", "breach_name"},
 }
 
+ALIAS_KIND = {alias: kind for kind, aliases in ALIASES.items() for alias in aliases}
+
+# Encodings in which the delimiter, quote and newline bytes can never occur
+# inside a multi-byte character, so raw lines can be split before decoding.
+ASCII_SAFE_CODECS = {"ascii", "utf-8", "utf-8-sig", "iso8859-1", "cp1252"}
+BARE_CR = re.compile(rb"\r(?!\n)")
+# Below roughly this many columns csv.reader's C loop beats splitting raw lines
+# in Python; the mmap path only pays off when most columns are skipped.
+MIN_SPLIT_COLUMNS = 24
+
 def log(msg: str, *, verbose: bool):
     if verbose:
         sys.stderr.write(str(msg) + "\n")
@@ -43,23 +71,29 @@ def log(msg: str, *, verbose: bool):
 def normalize(s: str) -> str:
     return (s or "").strip()
 
-def choose_col(header_lower, prefer: str, explicit: str | None) -> int | None:
-    if not header_lower:
-        return None
-    if explicit:
-        preferred = explicit.lower()
-        for i, h in enumerate(header_lower):
-            if h == preferred:
-                return i
-        for i, h in enumerate(header_lower):
-            if preferred in h:
-                return i
-    aliases = ALIASES.get(prefer, set())
+def explicit_col(header_lower, explicit: str) -> int | None:
+    preferred = explicit.lower()
+    if preferred in header_lower:
+        return header_lower.index(preferred)
     for i, h in enumerate(header_lower):
-        if h in aliases:
+        if preferred in h:
             return i
     return None
 
+def resolve_columns(header_lower, explicit: dict) -> dict:
+    """Map each ALIASES kind to a header index in one pass; explicit names win when found."""
+    resolved = {}
+    for i, h in enumerate(header_lower):
+        kind = ALIAS_KIND.get(h)
+        if kind is not None and kind not in resolved:
+            resolved[kind] = i
+    for kind, name in explicit.items():
+        if name:
+            idx = explicit_col(header_lower, name)
+            if idx is not None:
+                resolved[kind] = idx
+    return resolved
+
 def detect_dialect(sample: str, fallback="excel"):
     sniffer = csv.Sniffer()
     try:
@@ -79,19 +113,247 @@ def detect_dialect(sample: str, fallback="excel"):
         F.__name__ = f"Detected_{delim.encode('unicode_escape').decode()}"
         return F
 
-def build_name(row, idx_name, idx_first, idx_last):
-    name = ""
-    if idx_name is not None and idx_name < len(row):
-        name = normalize(row[idx_name])
-    if not name:
-        fn = normalize(row[idx_first]) if idx_first is not None and idx_first < len(row) else ""
-        ln = normalize(row[idx_last]) if idx_last is not None and idx_last < len(row) else ""
-        name = (fn + (" " if fn and ln else "") + ln).strip()
-    return name
+def write_json(path, obj):
+    """Write obj as 2-space indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(obj, f, ensure_ascii=False, indent=2)
+
+def resume_lines(sample: str, fh):
+    """Yield the lines of an already-read sample, then the rest of fh (no seek back)."""
+    lines = io.StringIO(sample, newline="").readlines()
+    if lines and not lines[-1].endswith(("\n", "\r")):
+        # sample ended mid-line; complete it from the file
+        lines[-1] += fh.readline()
+    return itertools.chain(lines, fh)
+
+def split_rows_unquoted(fh, dialect, encoding, wanted, width):
+    """Rows of fh (after its header line) split straight from an mmap, or None.
+
+    Only usable when the whole file contains no quote character: then every
+    line is exactly one row and plain bytes.split() matches csv.reader. Returns
+    None whenever csv.reader is needed, or is faster (header narrower than
+    MIN_SPLIT_COLUMNS).
+    """
+    if (width < MIN_SPLIT_COLUMNS or dialect.escapechar or len(dialect.delimiter) != 1 or not dialect.delimiter.isascii()
+            or (dialect.quotechar and not dialect.quotechar.isascii())
+            or codecs.lookup(encoding).name not in ASCII_SAFE_CODECS):
+        return None
+    try:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):
+        return None
+    if ((dialect.quotechar and mm.find(dialect.quotechar.encode("ascii")) != -1)
+            or BARE_CR.search(mm)):  # csv.reader also ends rows at a lone \r
+        mm.close()
+        return None
+    eol = mm.find(b"\n")
+    start = len(mm) if eol == -1 else eol + 1  # header was already read via csv.reader
+    return iter_split_rows(mm, start, dialect.delimiter.encode("ascii"), encoding, wanted)
+
+def iter_split_rows(mm, pos, delim: bytes, encoding: str, wanted):
+    """Yield rows as lists of raw fields; only the `wanted` columns are decoded to str."""
+    try:
+        end = len(mm)
+        while pos < end:
+            eol = mm.find(b"\n", pos)
+            if eol == -1:
+                eol = end
+            line = mm[pos:eol]
+            pos = eol + 1
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            fields = line.split(delim)
+            n = len(fields)
+            for i in wanted:
+                if i < n:
+                    fields[i] = fields[i].decode(encoding, "replace")
+            yield fields
+    finally:
+        mm.close()
+
+def scan_rows(reader, idx_email, idx_name, idx_first, idx_last, idx_breach, prefer_domain, limit):
+    """Scan csv.reader rows; return (displays in rank order, unique breach count).
+
+    Rows are bucketed by rank instead of sorted; once a bucket holds `limit`
+    unique displays, rows of that rank or worse cannot reach the excerpt and
+    are skipped (breaches are still counted for every row).
+    """
+    # -1 marks an unresolved column so the bounds check is a single chained compare
+    idx_email, idx_name, idx_first, idx_last, idx_breach = (
+        -1 if i is None else i for i in (idx_email, idx_name, idx_first, idx_last, idx_breach))
+    has_name_parts = idx_first >= 0 or idx_last >= 0
+    buckets = ({}, {}, {}, {})  # rank -> displays in first-seen order (dict as ordered set)
+    cutoff = len(buckets)  # ranks >= cutoff can no longer reach the excerpt
+    cap = max(limit, 1)
+    breaches = set()
+    breach_cells = set()  # raw breach cells already counted; the column repeats a few values
+    prefer_dom_lc = prefer_domain.lower() if prefer_domain else None
+    domain_hit = {}  # raw email domain -> prefer_hit, so each domain is lowercased once
+
+    has_name_cols = idx_name >= 0 or has_name_parts
+    # Best rank any row can reach; once a bucket at this rank is full the excerpt is settled
+    best_rank = (0 if prefer_dom_lc else 2) + (0 if has_name_cols else 1)
+
+    rows = iter(reader)
+    if idx_email >= 0:
+        for row in rows:
+            n = len(row)
+            # breaches
+            if 0 <= idx_breach < n:
+                b_raw = row[idx_breach]
+                if b_raw not in breach_cells:
+                    breach_cells.add(b_raw)
+                    b = b_raw.strip()
+                    if b:
+                        breaches.add(b)
+
+            # emails + names
+            if idx_email >= n:
+                continue
+            email = row[idx_email].strip()
+            if not email:
+                continue
+            if has_name_cols:
+                name = row[idx_name].strip() if 0 <= idx_name < n else ""
+                if not name and has_name_parts:
+                    fn = row[idx_first].strip() if 0 <= idx_first < n else ""
+                    ln = row[idx_last].strip() if 0 <= idx_last < n else ""
+                    name = (fn + (" " if fn and ln else "") + ln).strip()
+            else:
+                name = ""
+
+            # Ranking, packed into one small int (lower ranks first):
+            # 0) prefer preferred-domain emails (if provided)
+            # 1) prefer entries with a non-empty name
+            # 2) original order is preserved within each bucket
+            prefer_hit = 1
+            if prefer_dom_lc:
+                _, at, dom = email.rpartition("@")
+                if at:  # a cell without "@" has no domain and never matches
+                    prefer_hit = domain_hit.get(dom)
+                    if prefer_hit is None:
+                        prefer_hit = domain_hit[dom] = 0 if dom.lower() == prefer_dom_lc else 1
+            has_name = 0 if name else 1
+            rank = prefer_hit * 2 + has_name
+            if rank >= cutoff:
+                continue
+            bucket = buckets[rank]
+            bucket[f"{name} <{email}>" if name else email] = None
+            if len(bucket) >= cap:
+                cutoff = rank
+                if cutoff <= best_rank:
+                    break
+
+    # Excerpt settled (or no email column): remaining rows only feed the breach count
+    if idx_breach >= 0:
+        for row in rows:
+            if idx_breach < len(row):
+                b_raw = row[idx_breach]
+                if b_raw not in breach_cells:
+                    breach_cells.add(b_raw)
+                    b = b_raw.strip()
+                    if b:
+                        breaches.add(b)
+
+    return itertools.chain.from_iterable(buckets), len(breaches)
+
+def quote_after_space(path, dialect, encoding) -> bool:
+    """True if the file may contain '<delim><spaces><quote>' (always True when bytes can't be searched)."""
+    if (codecs.lookup(encoding).name not in ASCII_SAFE_CODECS
+            or not dialect.delimiter.isascii() or not dialect.quotechar.isascii()):
+        return True
+    # encode as ascii: codecs like utf-8-sig would prepend a BOM to each piece
+    pattern = re.compile(re.escape(dialect.delimiter.encode("ascii")) + rb" +" + re.escape(dialect.quotechar.encode("ascii")))
+    with open(path, "rb") as fh:
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return False
+        with mm:
+            return pattern.search(mm) is not None
+
+def scan_arrow(path, dialect, encoding, idx_email, idx_name, idx_first, idx_last, idx_breach, prefer_domain):
+    """Same contract as scan_rows, but parses only the needed columns with pyarrow.
 
-def email_domain(email: str) -> str:
-    m = re.search(r"@([^>]+)$", email)
-    return m.group(1).lower() if m else ""
+    Raises pa.ArrowException/ValueError on input pyarrow cannot take as-is
+    (ragged rows, undecodable bytes, ...); the caller falls back to scan_rows.
+    """
+    wanted = sorted({i for i in (idx_email, idx_name, idx_first, idx_last, idx_breach) if i is not None})
+    if not wanted:
+        return [], 0
+    if dialect.skipinitialspace and dialect.quotechar and quote_after_space(path, dialect, encoding):
+        # Arrow has no skipinitialspace: '<delim> "x"' would keep its quotes
+        raise ValueError("quoted field after delimiter + space needs csv.reader")
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(encoding=encoding, autogenerate_column_names=True, skip_rows_after_names=1),
+        parse_options=pacsv.ParseOptions(
+            delimiter=dialect.delimiter,
+            quote_char=dialect.quotechar or False,
+            double_quote=dialect.doublequote,
+            escape_char=dialect.escapechar or False,
+            newlines_in_values=True,
+        ),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=[f"f{i}" for i in wanted],
+            column_types={f"f{i}": pa.string() for i in wanted},
+        ),
+    )
+
+    def col(idx):
+        return pc.utf8_trim_whitespace(table.column(f"f{idx}")) if idx is not None else None
+
+    breach_count = 0
+    if idx_breach is not None:
+        b = col(idx_breach)
+        breach_count = pc.count_distinct(pc.filter(b, pc.not_equal(b, ""))).as_py()
+
+    if idx_email is None:
+        return [], breach_count
+
+    email = col(idx_email)
+    sort_cols = {}  # rank keys in priority order; False sorts first
+    if prefer_domain:
+        # same as scan_rows: text after the last "@"; cells without "@" never match
+        dom = pc.utf8_lower(pc.replace_substring_regex(email, "(?s)^.*@", ""))
+        hit = pc.and_(pc.match_substring(email, "@"), pc.equal(dom, prefer_domain.lower()))
+        sort_cols["prefer_miss"] = pc.invert(hit)
+    if idx_name is not None or idx_first is not None or idx_last is not None:
+        empty = pa.scalar("", pa.string())
+        fn = col(idx_first) if idx_first is not None else empty
+        ln = col(idx_last) if idx_last is not None else empty
+        name = pc.utf8_trim_whitespace(pc.binary_join_element_wise(fn, ln, " "))
+        if idx_name is not None:
+            full = col(idx_name)
+            name = pc.if_else(pc.not_equal(full, ""), full, name)
+        has_name = pc.not_equal(name, "")
+        display = pc.if_else(has_name, pc.binary_join_element_wise(name, " <", email, ">", ""), email)
+        sort_cols["name_miss"] = pc.invert(has_name)
+    else:
+        display = email
+
+    ranked = pa.table({**sort_cols, "display": display}).filter(pc.not_equal(email, ""))
+    if not sort_cols:
+        return iter_taken(ranked.column("display")), breach_count
+    # sort_indices is stable, so ties keep file order like scan_rows
+    order = pc.sort_indices(ranked, sort_keys=[(k, "ascending") for k in sort_cols])
+    return iter_taken(ranked.column("display"), order), breach_count
+
+def iter_taken(values, order=None, batch=4096):
+    """Yield values[order] (or values as-is) as Python objects, one batch at a time.
+
+    The excerpt usually stops after a few unique entries, so materializing the
+    whole ranked column with to_pylist() would be wasted work.
+    """
+    for start in range(0, len(values), batch):
+        if order is None:
+            yield from values.slice(start, batch).to_pylist()
+        else:
+            yield from values.take(order.slice(start, batch)).to_pylist()
 
 def main():
     ap = argparse.ArgumentParser(description="Generate an excerpt of names & emails and count unique breached databases.")
@@ -118,7 +380,6 @@ def main():
 
     with open(args.csv, "r", encoding=args.encoding, errors="replace", newline="") as fh:
         sample = fh.read(65536)
-        fh.seek(0)
         if args.delimiter == "auto":
             dialect = detect_dialect(sample)
             log(f"Detected delimiter: {dialect.delimiter!r}", verbose=verbose)
@@ -134,7 +395,7 @@ def main():
             dialect = Manual
             log(f"Using manual delimiter: {dialect.delimiter!r}", verbose=verbose)
 
-        reader = csv.reader(fh, dialect=dialect)
+        reader = csv.reader(resume_lines(sample, fh), dialect=dialect)
         try:
             header = next(reader)
         except StopIteration:
@@ -143,8 +404,7 @@ def main():
             print()
             print("Breached Databases: 0")
             if args.json_file:
-                with open(args.json_file, "w", encoding="utf-8") as jf:
-                    json.dump({"excerpt": [], "breached_databases": 0}, jf, ensure_ascii=False, indent=2)
+                write_json(args.json_file, {"excerpt": [], "breached_databases": 0})
             return
         except csv.Error as e:
             print(f"ERROR: CSV header parse failed: {e}", file=sys.stderr)
@@ -152,51 +412,43 @@ def main():
 
         header_lower = [normalize(h).lower() for h in header]
 
-        idx_email = choose_col(header_lower, "email", args.email_col)
-        idx_name  = choose_col(header_lower, "name", args.name_col)
-        idx_first = choose_col(header_lower, "first", args.first_col)
-        idx_last  = choose_col(header_lower, "last", args.last_col)
-        idx_breach= choose_col(header_lower, "breach", args.breach_col)
+        cols = resolve_columns(header_lower, {
+            "email": args.email_col,
+            "name": args.name_col,
+            "first": args.first_col,
+            "last": args.last_col,
+            "breach": args.breach_col,
+        })
+        idx_email = cols.get("email")
+        idx_name  = cols.get("name")
+        idx_first = cols.get("first")
+        idx_last  = cols.get("last")
+        idx_breach= cols.get("breach")
 
         if idx_email is None:
             # Still proceed to count breaches, but excerpt will be empty.
             log("Warning: no email column found; excerpt may be empty.", verbose=verbose)
 
-        # Accumulators
-        items = []  # collect tuples for ranking: (rank_tuple, display)
-        breaches = set()
-
-        # Scan rows
-        for row in reader:
-            # breaches
-            if idx_breach is not None and idx_breach < len(row):
-                b = normalize(row[idx_breach])
-                if b:
-                    breaches.add(b)
-
-            # emails + names
-            if idx_email is None or idx_email >= len(row):
-                continue
-            email = normalize(row[idx_email])
-            if not email:
-                continue
-            name = build_name(row, idx_name, idx_first, idx_last)
-            display = f"{name} <{email}>" if name else email
-
-            # Ranking:
-            # 0) prefer preferred-domain emails (if provided)
-            # 1) prefer entries with a non-empty name
-            # 2) preserve original order via incremental counter
-            dom = email_domain(email)
-            prefer_hit = 0 if (args.prefer_domain and dom == args.prefer_domain.lower()) else 1
-            has_name = 0 if name else 1
-            items.append(((prefer_hit, has_name, len(items)), display))
+        ranked = None
+        if pa is not None:
+            try:
+                ranked, breach_count = scan_arrow(args.csv, dialect, args.encoding, idx_email, idx_name, idx_first, idx_last, idx_breach, args.prefer_domain)
+                log("Parsed rows with pyarrow", verbose=verbose)
+            except (pa.ArrowException, ValueError) as e:
+                log(f"pyarrow parse failed ({e}); falling back to csv.reader", verbose=verbose)
+        if ranked is None:
+            wanted = sorted({i for i in (idx_email, idx_name, idx_first, idx_last, idx_breach) if i is not None})
+            rows = split_rows_unquoted(fh, dialect, args.encoding, wanted, len(header))
+            if rows is not None:
+                log("No quoting found; splitting lines directly from mmap", verbose=verbose)
+            else:
+                rows = reader
+            ranked, breach_count = scan_rows(rows, idx_email, idx_name, idx_first, idx_last, idx_breach, args.prefer_domain, args.limit)
 
         # Deduplicate preserving best rank then order
-        items.sort(key=lambda x: x[0])
         seen = set()
         excerpt_list = []
-        for _, disp in items:
+        for disp in ranked:
             if disp in seen:
                 continue
             seen.add(disp)
@@ -215,13 +467,12 @@ def main():
             else:
                 print("(no rows with emails found)")
         print()
-        print(f"Breached Databases: {len(breaches)}")
+        print(f"Breached Databases: {breach_count}")
 
         # Optional JSON sidecar
         if args.json_file:
             try:
-                with open(args.json_file, "w", encoding="utf-8") as jf:
-                    json.dump({"excerpt": excerpt_list, "breached_databases": len(breaches)}, jf, ensure_ascii=False, indent=2)
+                write_json(args.json_file, {"excerpt": excerpt_list, "breached_databases": breach_count})
                 log(f"Wrote JSON summary to {args.json_file}", verbose=verbose)
             except Exception as e:
                 print(f"ERROR: failed to write JSON file: {e}", file=sys.stderr)
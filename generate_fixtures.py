@@ -21,18 +21,31 @@ Flags:
   --freemail-domains      comma list for freemail pool (default: gmail.com,outlook.com,yahoo.com)
   --breaches              comma list of breach names to sample (default: LinkedIn,Dropbox,Adobe,Canva,Twitter,Collection#1)
   --include-passwords     include plaintext/hashed password-ish fields (default: off)
+  --format FMT            json (default; what dehashed_domain_search.sh reads), jsonl
+                          (one entry per line) or parquet (columnar, zstd; needs pyarrow)
 """
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
+import multiprocessing
 import os
 import random
 import string
 from datetime import datetime, timedelta
 
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is used instead
+    orjson = None
+
 FREEMAIL_DEFAULT = ["gmail.com", "outlook.com", "yahoo.com"]
 BREACHES_DEFAULT = ["LinkedIn", "Dropbox", "Adobe", "Canva", "Twitter", "Collection#1"]
+PW_ALPHABET = string.ascii_letters + string.digits + "!@#$%^&*"
+IP_OCTETS = range(1, 255)
+PAST_YEAR_MINUTES = range(366 * 24 * 60)
+ENTRY_CHUNK = 10000  # entries generated and serialized per batch within a page
 
 FNAMES = ["Alice","Bob","Carol","Dave","Eve","Frank","Grace","Heidi","Ivan","Judy","Mallory","Niaj","Olivia","Peggy","Rupert","Sybil","Trent","Uma","Victor","Wendy"]
 LNAMES = ["Smith","Johnson","Brown","Taylor","Anderson","Thomas","Jackson","White","Harris","Martin","Thompson","Garcia","Martinez","Robinson","Clark"]
@@ -48,22 +61,124 @@ def rand_user(first, last):
     return random.choice(parts) + suffix
 
 def rand_password():
-    chars = string.ascii_letters + string.digits + "!@#$%^&*"
-    return "".join(random.choice(chars) for _ in range(random.randint(8, 14)))
+    return "".join(random.choices(PW_ALPHABET, k=random.randint(8, 14)))
 
 def rand_hash():
-    return "".join(random.choice("0123456789abcdef") for _ in range(64))
+    return f"{random.getrandbits(256):064x}"
 
 def rand_ip():
-    return ".".join(str(random.randint(1, 254)) for _ in range(4))
+    return ".".join(map(str, random.choices(IP_OCTETS, k=4)))
 
 def rand_addr():
     return f"{random.randint(10,9999)} {random.choice(['Main','Oak','Pine','Cedar','Maple','Elm'])} St"
 
-def rand_datetime_past_year():
-    days_back = random.randint(0, 365)
-    dt = datetime.utcnow() - timedelta(days=days_back, hours=random.randint(0,23), minutes=random.randint(0,59))
-    return dt.replace(microsecond=0).isoformat() + "Z"
+def rand_datetimes_past_year(now, n):
+    # up to 365 days, 23 hours and 59 minutes back from `now`, drawn in one call
+    return [(now - timedelta(minutes=m)).isoformat() + "Z" for m in random.choices(PAST_YEAR_MINUTES, k=n)]
+
+def dump_entry(entry) -> bytes:
+    """One entry as indent=2 JSON, indented one more level for the "entries" list."""
+    if orjson is not None:
+        raw = orjson.dumps(entry, option=orjson.OPT_INDENT_2)
+    else:
+        raw = json.dumps(entry, ensure_ascii=False, indent=2).encode("utf-8")
+    return b"    " + raw.replace(b"\n", b"\n    ")
+
+def write_entries(path, entries) -> int:
+    """Stream {"entries": [...]} to path entry by entry; same bytes as json.dump(indent=2)."""
+    count = 0
+    with open(path, "wb") as f:
+        f.write(b'{\n  "entries": [')
+        for entry in entries:
+            f.write(b",\n" if count else b"\n")
+            f.write(dump_entry(entry))
+            count += 1
+        f.write(b"\n  ]\n}" if count else b"]\n}")
+    return count
+
+def page_columns(args, n, freemails, breaches, now):
+    """Generate n entries column by column (struct-of-arrays): {field: [values]}."""
+    firsts = random.choices(FNAMES, k=n)
+    lasts = random.choices(LNAMES, k=n)
+    domains = [args.domain if random.random() < args.prefer_corporate else fm
+               for fm in random.choices(freemails or [args.domain], k=n)]
+    usernames = [rand_user(first, last) for first, last in zip(firsts, lasts)]
+    columns = {
+        "email": [f"{u}@{d}" for u, d in zip(usernames, domains)],
+        "first_name": firsts,
+        "last_name": lasts,
+        "name": [f"{first} {last}" for first, last in zip(firsts, lasts)],
+        "username": usernames,
+        "breach": random.choices(breaches, k=n),
+        "source": ["fixture"] * n,
+        "ip": [rand_ip() for _ in range(n)],
+        "address": [rand_addr() for _ in range(n)],
+        "created_at": rand_datetimes_past_year(now, n),
+        "updated_at": rand_datetimes_past_year(now, n),
+        "domain": domains,
+    }
+    if args.include_passwords:
+        columns["password"] = [rand_password() for _ in range(n)]
+        columns["hashed_password"] = [rand_hash() for _ in range(n)]
+        columns["hash"] = [rand_hash() for _ in range(n)]
+        columns["password_hash"] = [rand_hash() for _ in range(n)]
+    return columns
+
+def write_jsonl(path, entries) -> int:
+    """Write one compact JSON object per line."""
+    count = 0
+    with open(path, "wb") as f:
+        for entry in entries:
+            if orjson is not None:
+                f.write(orjson.dumps(entry) + b"\n")
+            else:
+                f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n")
+            count += 1
+    return count
+
+def write_parquet(path, chunks) -> int:
+    """Write column chunks as row groups of a zstd-compressed Parquet file."""
+    import pyarrow as pa  # optional; imported only for --format parquet
+    import pyarrow.parquet as pq
+
+    count = 0
+    writer = None
+    try:
+        for columns in chunks:
+            table = pa.table({k: pa.array(v, pa.string()) for k, v in columns.items()})
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+            count += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return count
+
+def iter_page_columns(args, freemails, breaches, now):
+    """Yield a page as column dicts of up to ENTRY_CHUNK entries (at least one, possibly empty)."""
+    for start in range(0, max(args.per_page, 1), ENTRY_CHUNK):
+        yield page_columns(args, max(min(ENTRY_CHUNK, args.per_page - start), 0), freemails, breaches, now)
+
+def iter_entries(chunks):
+    """Turn column chunks back into per-entry dicts, one at a time."""
+    for columns in chunks:
+        keys = list(columns)
+        for vals in zip(*columns.values()):
+            yield dict(zip(keys, vals))
+
+def build_page(task):
+    """Generate and write one fixture page; returns (path, entry count)."""
+    args, page, freemails, breaches, now = task
+    random.seed(f"{args.seed}:{page}")  # per-page stream, independent of worker scheduling
+
+    chunks = iter_page_columns(args, freemails, breaches, now)
+    path = os.path.join(args.out, f"{args.domain}_page{page}.{args.format}")
+    if args.format == "parquet":
+        return path, write_parquet(path, chunks)
+    if args.format == "jsonl":
+        return path, write_jsonl(path, iter_entries(chunks))
+    return path, write_entries(path, iter_entries(chunks))
 
 def main():
     ap = argparse.ArgumentParser()
@@ -76,52 +191,30 @@ def main():
     ap.add_argument("--freemail-domains", default=",".join(FREEMAIL_DEFAULT))
     ap.add_argument("--breaches", default=",".join(BREACHES_DEFAULT))
     ap.add_argument("--include-passwords", action="store_true")
+    ap.add_argument("--format", choices=["json", "jsonl", "parquet"], default="json")
     args = ap.parse_args()
 
-    random.seed(args.seed)
+    if args.format == "parquet":
+        try:
+            import pyarrow.parquet  # noqa: F401  (used by write_parquet in the workers)
+        except ImportError:
+            ap.error("--format parquet requires pyarrow")
+
     os.makedirs(args.out, exist_ok=True)
 
     freemails = [d.strip() for d in args.freemail_domains.split(",") if d.strip()]
     breaches = [b.strip() for b in args.breaches.split(",") if b.strip()]
 
+    # Pages are independent (each reseeds from --seed and its page number), so
+    # they are generated and written in parallel; imap keeps the report in order.
+    now = datetime.utcnow().replace(microsecond=0)
+    tasks = [(args, page, freemails, breaches, now) for page in range(1, args.pages + 1)]
+    workers = min(len(tasks), os.cpu_count() or 1)
     total = 0
-    for page in range(1, args.pages + 1):
-        entries = []
-        for _ in range(args.per_page):
-            first = random.choice(FNAMES)
-            last = random.choice(LNAMES)
-            use_corp = random.random() < args.prefer_corporate
-            domain = args.domain if use_corp else random.choice(freemails)
-            username = rand_user(first, last)
-            email = f"{username}@{domain}"
-
-            item = {
-                "email": email,
-                "first_name": first,
-                "last_name": last,
-                "name": f"{first} {last}",
-                "username": username,
-                "breach": random.choice(breaches),
-                "source": "fixture",
-                "ip": rand_ip(),
-                "address": rand_addr(),
-                "created_at": rand_datetime_past_year(),
-                "updated_at": rand_datetime_past_year(),
-                "domain": domain,
-            }
-            if args.include_passwords:
-                item["password"] = rand_password()
-                item["hashed_password"] = rand_hash()
-                item["hash"] = rand_hash()
-                item["password_hash"] = rand_hash()
-
-            entries.append(item)
-            total += 1
-
-        path = os.path.join(args.out, f"{args.domain}_page{page}.json")
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump({"entries": entries}, f, ensure_ascii=False, indent=2)
-        print(f"Wrote {path} ({len(entries)} entries)")
+    with (multiprocessing.Pool(workers) if workers > 1 else contextlib.nullcontext()) as pool:
+        for path, count in (pool.imap if pool else map)(build_page, tasks):
+            print(f"Wrote {path} ({count} entries)")
+            total += count
 
     print(f"Done. Generated {total} entries across {args.pages} page(s) into {args.out}")
 